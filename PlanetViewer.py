@@ -1,14 +1,26 @@
 #!/usr/bin/env python3
 import csv
+from bisect import bisect_left
 import bz2
-import shutil
+import mmap
+import re
+import queue
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from operator import itemgetter
 from pathlib import Path
 import sqlite3
 import requests
 import tkinter as tk
 from tkinter import ttk, messagebox
 import os, sys
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pac
+except ImportError:
+    pa = None
 
 BASE_URL = "https://www.fuzzwork.co.uk/dump/latest/"
 DATA_FILES = [
@@ -34,13 +46,28 @@ def _resolve_storage_paths():
 
 DB_PATH, DATA_DIR = _resolve_storage_paths()
 
-BATCH_SIZE = 10000
-PLANET_BATCH_SIZE = 20000
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+PLANET_BATCH_ROWS = 65536
+RENDER_BATCH_SIZE = 50
+LOAD_POLL_MS = 20
+DELETE_BATCH_SIZE = 500
+
+SCHEMA_VERSION = 1
+LOOKUP_TABLES = ["mapRegions", "mapConstellations", "mapSolarSystems", "invTypes"]
+PLANET_INDEXES = {
+    "idx_planets_region_category": "regionID, category",
+    "idx_planets_constellation_category": "constellationID, category",
+    "idx_planets_system_category": "solarSystemID, category",
+}
+PLANET_INDEX_COLUMNS = ("regionID", "constellationID", "solarSystemID")
+KIND_COLUMNS = {"region": "regionID", "constellation": "constellationID", "system": "solarSystemID"}
 
 PLANET_TYPES = [
     "Temperate", "Ice", "Gas", "Oceanic", "Lava",
     "Barren", "Storm", "Plasma", "Shattered", "Scorched Barren"
 ]
+_PT = tuple(PLANET_TYPES)
+_pt_counts = itemgetter(*_PT)
 COL_HEADERS = [
     "Total Planets",
     "Planet (Temperate)",
@@ -55,6 +82,9 @@ COL_HEADERS = [
     "Planet (Scorched Barren)",
     "Radius (km)",
 ]
+_BLANK_ROW = ("",) * len(COL_HEADERS)
+_BLANK_TAIL = _BLANK_ROW[1:]
+_BLANK_LEAD = _BLANK_ROW[:-1]
 
 def status_safe(ui, msg):
     ui.root.after(0, ui.status_var.set, msg)
@@ -62,15 +92,97 @@ def status_safe(ui, msg):
 def try_int(x, default=None):
     try:
         return int(x)
-    except Exception:
+    except (TypeError, ValueError):
         return default
 
 def try_float(x, default=None):
     try:
         return float(x)
-    except Exception:
+    except (TypeError, ValueError):
         return default
 
+def _header_index(header):
+    return {name.strip(): i for i, name in enumerate(header)}
+
+def _planet_rows_mmap(path, type_map, cat_map):
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            nl = mm.find(b"\n")
+            if nl < 0:
+                nl = size
+            idx = _header_index(next(csv.reader([mm[:nl].decode("utf-8")]), []))
+            i_itemID = idx["itemID"]
+            i_typeID = idx["typeID"]
+            i_groupID = idx["groupID"]
+            i_solarSystemID = idx["solarSystemID"]
+            i_constellationID = idx["constellationID"]
+            i_regionID = idx["regionID"]
+            i_orbitalID = idx.get("orbitalID", idx.get("orbitID"))
+            i_radius = idx["radius"]
+            i_itemName = idx["itemName"]
+            width = max(i_itemID, i_typeID, i_groupID, i_solarSystemID, i_constellationID,
+                        i_regionID, i_orbitalID, i_radius, i_itemName) + 1
+            planet_line = re.compile(rb"\n" + rb"[^,\n]*," * i_groupID + rb"7(?![^,\r\n])[^\n]*")
+            for m in planet_line.finditer(mm, nl):
+                line = m.group()[1:].rstrip(b"\r")
+                if b'"' in line:
+                    r = next(csv.reader([line.decode("utf-8")]))
+                    if len(r) < width or r[i_groupID] != "7":
+                        continue
+                    itemName = r[i_itemName]
+                else:
+                    r = line.split(b",")
+                    if len(r) < width:
+                        continue
+                    itemName = r[i_itemName].decode("utf-8")
+                try:
+                    itemID = int(r[i_itemID])
+                    typeID = int(r[i_typeID])
+                    solarSystemID = int(r[i_solarSystemID])
+                except ValueError:
+                    continue
+                if not (itemID and typeID and solarSystemID):
+                    continue
+                constellationID = try_int(r[i_constellationID])
+                regionID = try_int(r[i_regionID])
+                orbitalID = try_int(r[i_orbitalID])
+                radius_m = try_float(r[i_radius])
+                radius_km = radius_m / 1000.0 if radius_m is not None else None
+                typeName = type_map.get(typeID)
+                category = cat_map.get(typeID, "Barren")
+                yield (itemID, typeID, 7, category, typeName, itemName,
+                       solarSystemID, constellationID, regionID, orbitalID, radius_km)
+
+def _planet_rows_arrow(path, type_map, cat_map):
+    with path.open("r", encoding="utf-8") as f:
+        header = _header_index(next(csv.reader(f), []))
+    orbital_col = "orbitalID" if "orbitalID" in header else "orbitID"
+    int_cols = ["itemID", "typeID", "groupID", "solarSystemID", "constellationID", "regionID", orbital_col]
+    t = pac.read_csv(
+        path,
+        convert_options=pac.ConvertOptions(
+            include_columns=int_cols + ["radius", "itemName"],
+            column_types={**{c: pa.int64() for c in int_cols}, "radius": pa.float64(), "itemName": pa.string()},
+            null_values=["", "None"],
+            strings_can_be_null=False,
+        ),
+    )
+    t = t.filter(pc.equal(t["groupID"], 7))
+    t = t.filter(pc.and_(pc.and_(pc.not_equal(t["itemID"], 0), pc.not_equal(t["typeID"], 0)),
+                         pc.not_equal(t["solarSystemID"], 0)))
+    type_ids = pa.array(list(type_map), type=pa.int64())
+    pos = pc.index_in(t["typeID"], value_set=type_ids)
+    type_names = pc.take(pa.array(list(type_map.values()), type=pa.string()), pos)
+    categories = pc.fill_null(pc.take(pa.array([cat_map[tid] for tid in type_map], type=pa.string()), pos), "Barren")
+    radius_km = pc.divide(t["radius"], 1000.0)
+    columns = [t["itemID"], t["typeID"], t["groupID"], categories, type_names, t["itemName"],
+               t["solarSystemID"], t["constellationID"], t["regionID"], t[orbital_col], radius_km]
+    for start in range(0, t.num_rows, PLANET_BATCH_ROWS):
+        yield from zip(*(col.slice(start, PLANET_BATCH_ROWS).to_pylist() for col in columns))
+
 def categorize_type(type_name):
     t = (type_name or "").lower()
     if "temperate" in t:
@@ -98,21 +210,48 @@ def categorize_type(type_name):
 class EveDB:
     def __init__(self, path):
         self.path = path
-        self.con = sqlite3.connect(self.path, check_same_thread=False)
+        self._tls = threading.local()
         self.lock = threading.Lock()
+        self._region_names = {}
+        self._constellation_names = {}
+        self._system_names = {}
         with self.lock:
-            self.con.execute("PRAGMA journal_mode=WAL;")
-            self.con.execute("PRAGMA synchronous=NORMAL;")
+            con = sqlite3.connect(self.path, check_same_thread=False)
+            con.execute("PRAGMA page_size=32768;")
+            con.execute("PRAGMA journal_mode=WAL;")
+            self._tls.con = self._configure(con)
             self._ensure_schema()
 
+    @property
+    def con(self):
+        con = getattr(self._tls, "con", None)
+        if con is None:
+            con = self._tls.con = self._configure(sqlite3.connect(self.path, check_same_thread=False))
+        return con
+
+    def _configure(self, con):
+        con.execute("PRAGMA synchronous=NORMAL;")
+        con.execute("PRAGMA temp_store=MEMORY;")
+        con.execute("PRAGMA cache_size=-200000;")
+        con.execute("PRAGMA mmap_size=1073741824;")
+        return con
+
     def _ensure_schema(self):
         cur = self.con.cursor()
+        cur.execute("BEGIN")
+        legacy = []
+        if cur.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            existing = {name for (name,) in cur.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for table in LOOKUP_TABLES:
+                if table in existing:
+                    cur.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+                    legacy.append(table)
         cur.execute(
             """
             CREATE TABLE IF NOT EXISTS mapRegions (
                 regionID INTEGER PRIMARY KEY,
                 regionName TEXT
-            )
+            ) WITHOUT ROWID
             """
         )
         cur.execute(
@@ -121,7 +260,7 @@ class EveDB:
                 constellationID INTEGER PRIMARY KEY,
                 regionID INTEGER,
                 constellationName TEXT
-            )
+            ) WITHOUT ROWID
             """
         )
         cur.execute(
@@ -130,7 +269,7 @@ class EveDB:
                 solarSystemID INTEGER PRIMARY KEY,
                 constellationID INTEGER,
                 solarSystemName TEXT
-            )
+            ) WITHOUT ROWID
             """
         )
         cur.execute(
@@ -139,7 +278,7 @@ class EveDB:
                 typeID INTEGER PRIMARY KEY,
                 groupID INTEGER,
                 typeName TEXT
-            )
+            ) WITHOUT ROWID
             """
         )
         cur.execute(
@@ -159,9 +298,14 @@ class EveDB:
             )
             """
         )
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_planets_region ON planets(regionID);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_planets_constellation ON planets(constellationID);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_planets_system ON planets(solarSystemID);")
+        for name in ("idx_planets_region", "idx_planets_constellation", "idx_planets_system"):
+            cur.execute(f"DROP INDEX IF EXISTS {name};")
+        for name, cols in PLANET_INDEXES.items():
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON planets({cols});")
+        for table in legacy:
+            cur.execute(f"INSERT INTO {table} SELECT * FROM {table}_legacy")
+            cur.execute(f"DROP TABLE {table}_legacy")
+        cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         self.con.commit()
 
     def clear_all(self):
@@ -173,97 +317,99 @@ class EveDB:
             cur.execute("DELETE FROM mapConstellations;")
             cur.execute("DELETE FROM mapRegions;")
             self.con.commit()
+        self.clear_caches()
 
     def import_csv_invTypes(self, path):
         with self.lock, path.open("r", encoding="utf-8") as f, self.con:
-            reader = csv.DictReader(f)
-            rows = []
-            for r in reader:
-                typeID = try_int(r.get("typeID"))
-                groupID = try_int(r.get("groupID"))
-                typeName = r.get("typeName")
-                if typeID is None:
-                    continue
-                rows.append((typeID, groupID, typeName))
-                if len(rows) >= BATCH_SIZE:
-                    self.con.executemany(
-                        "INSERT OR REPLACE INTO invTypes(typeID, groupID, typeName) VALUES (?,?,?)",
-                        rows,
-                    )
-                    rows.clear()
-            if rows:
-                self.con.executemany(
-                    "INSERT OR REPLACE INTO invTypes(typeID, groupID, typeName) VALUES (?,?,?)",
-                    rows,
-                )
+            reader = csv.reader(f)
+            idx = _header_index(next(reader, []))
+            i_typeID = idx["typeID"]
+            i_groupID = idx["groupID"]
+            i_typeName = idx["typeName"]
+            width = max(i_typeID, i_groupID, i_typeName) + 1
+            def _rows(reader):
+                for r in reader:
+                    if len(r) < width:
+                        continue
+                    try:
+                        typeID = int(r[i_typeID])
+                    except ValueError:
+                        continue
+                    yield (typeID, try_int(r[i_groupID]), r[i_typeName])
+            self.con.executemany(
+                "INSERT INTO invTypes(typeID, groupID, typeName) VALUES (?,?,?)",
+                _rows(reader),
+            )
 
     def import_csv_mapRegions(self, path):
         with self.lock, path.open("r", encoding="utf-8") as f, self.con:
-            reader = csv.DictReader(f)
-            rows = []
-            for r in reader:
-                regionID = try_int(r.get("regionID"))
-                name = r.get("regionName") or r.get("name")
-                if regionID is None or not name:
-                    continue
-                rows.append((regionID, name))
-                if len(rows) >= BATCH_SIZE:
-                    self.con.executemany(
-                        "INSERT OR REPLACE INTO mapRegions(regionID, regionName) VALUES (?,?)",
-                        rows,
-                    )
-                    rows.clear()
-            if rows:
-                self.con.executemany(
-                    "INSERT OR REPLACE INTO mapRegions(regionID, regionName) VALUES (?,?)",
-                    rows,
-                )
+            reader = csv.reader(f)
+            idx = _header_index(next(reader, []))
+            i_regionID = idx["regionID"]
+            i_name = idx.get("regionName", idx.get("name"))
+            width = max(i_regionID, i_name) + 1
+            def _rows(reader):
+                for r in reader:
+                    if len(r) < width:
+                        continue
+                    name = r[i_name]
+                    if not name:
+                        continue
+                    try:
+                        regionID = int(r[i_regionID])
+                    except ValueError:
+                        continue
+                    yield (regionID, name)
+            self.con.executemany(
+                "INSERT INTO mapRegions(regionID, regionName) VALUES (?,?)",
+                _rows(reader),
+            )
 
     def import_csv_mapConstellations(self, path):
         with self.lock, path.open("r", encoding="utf-8") as f, self.con:
-            reader = csv.DictReader(f)
-            rows = []
-            for r in reader:
-                constellationID = try_int(r.get("constellationID"))
-                regionID = try_int(r.get("regionID"))
-                name = r.get("constellationName") or r.get("name")
-                if constellationID is None or regionID is None:
-                    continue
-                rows.append((constellationID, regionID, name))
-                if len(rows) >= BATCH_SIZE:
-                    self.con.executemany(
-                        "INSERT OR REPLACE INTO mapConstellations(constellationID, regionID, constellationName) VALUES (?,?,?)",
-                        rows,
-                    )
-                    rows.clear()
-            if rows:
-                self.con.executemany(
-                    "INSERT OR REPLACE INTO mapConstellations(constellationID, regionID, constellationName) VALUES (?,?,?)",
-                    rows,
-                )
+            reader = csv.reader(f)
+            idx = _header_index(next(reader, []))
+            i_constellationID = idx["constellationID"]
+            i_regionID = idx["regionID"]
+            i_name = idx.get("constellationName", idx.get("name"))
+            width = max(i_constellationID, i_regionID, i_name) + 1
+            def _rows(reader):
+                for r in reader:
+                    if len(r) < width:
+                        continue
+                    try:
+                        constellationID = int(r[i_constellationID])
+                        regionID = int(r[i_regionID])
+                    except ValueError:
+                        continue
+                    yield (constellationID, regionID, r[i_name])
+            self.con.executemany(
+                "INSERT INTO mapConstellations(constellationID, regionID, constellationName) VALUES (?,?,?)",
+                _rows(reader),
+            )
 
     def import_csv_mapSolarSystems(self, path):
         with self.lock, path.open("r", encoding="utf-8") as f, self.con:
-            reader = csv.DictReader(f)
-            rows = []
-            for r in reader:
-                solarSystemID = try_int(r.get("solarSystemID"))
-                constellationID = try_int(r.get("constellationID"))
-                name = r.get("solarSystemName") or r.get("name")
-                if solarSystemID is None or constellationID is None:
-                    continue
-                rows.append((solarSystemID, constellationID, name))
-                if len(rows) >= BATCH_SIZE:
-                    self.con.executemany(
-                        "INSERT OR REPLACE INTO mapSolarSystems(solarSystemID, constellationID, solarSystemName) VALUES (?,?,?)",
-                        rows,
-                    )
-                    rows.clear()
-            if rows:
-                self.con.executemany(
-                    "INSERT OR REPLACE INTO mapSolarSystems(solarSystemID, constellationID, solarSystemName) VALUES (?,?,?)",
-                    rows,
-                )
+            reader = csv.reader(f)
+            idx = _header_index(next(reader, []))
+            i_solarSystemID = idx["solarSystemID"]
+            i_constellationID = idx["constellationID"]
+            i_name = idx.get("solarSystemName", idx.get("name"))
+            width = max(i_solarSystemID, i_constellationID, i_name) + 1
+            def _rows(reader):
+                for r in reader:
+                    if len(r) < width:
+                        continue
+                    try:
+                        solarSystemID = int(r[i_solarSystemID])
+                        constellationID = int(r[i_constellationID])
+                    except ValueError:
+                        continue
+                    yield (solarSystemID, constellationID, r[i_name])
+            self.con.executemany(
+                "INSERT INTO mapSolarSystems(solarSystemID, constellationID, solarSystemName) VALUES (?,?,?)",
+                _rows(reader),
+            )
 
     def build_planets_from_mapDenormalize(self, path):
         with self.lock:
@@ -273,229 +419,221 @@ class EveDB:
                 "SELECT typeID, groupID, typeName FROM invTypes WHERE groupID = 7"
             ):
                 type_map[typeID] = typeName
-            orig_sync = cur.execute("PRAGMA synchronous").fetchone()[0]
-            orig_temp = cur.execute("PRAGMA temp_store").fetchone()[0]
-            orig_cache = cur.execute("PRAGMA cache_size").fetchone()[0]
-            inserted = 0
-            self.con.commit()
-            cur.execute("PRAGMA synchronous=OFF")
-            cur.execute("PRAGMA temp_store=MEMORY")
-            cur.execute("PRAGMA cache_size=-200000")
+            cat_map = {tid: categorize_type(name) for tid, name in type_map.items()}
             try:
                 self.con.execute("BEGIN")
-                cur.execute("DROP INDEX IF EXISTS idx_planets_region")
-                cur.execute("DROP INDEX IF EXISTS idx_planets_constellation")
-                cur.execute("DROP INDEX IF EXISTS idx_planets_system")
-                with path.open("r", encoding="utf-8") as f:
-                    reader = csv.DictReader(f)
-                    rows = []
-                    for r in reader:
-                        groupID = try_int(r.get("groupID"))
-                        if groupID != 7:
-                            continue
-                        itemID = try_int(r.get("itemID"))
-                        typeID = try_int(r.get("typeID"))
-                        solarSystemID = try_int(r.get("solarSystemID"))
-                        constellationID = try_int(r.get("constellationID"))
-                        regionID = try_int(r.get("regionID"))
-                        orbitalID = try_int(r.get("orbitalID")) if r.get("orbitalID") is not None else try_int(r.get("orbitID"))
-                        radius_m = try_float(r.get("radius"))
-                        radius_km = radius_m / 1000.0 if radius_m is not None else None
-                        itemName = r.get("itemName")
-                        if not (itemID and typeID and solarSystemID):
-                            continue
-                        typeName = type_map.get(typeID)
-                        category = categorize_type(typeName)
-                        rows.append((itemID, typeID, groupID, category, typeName, itemName,
-                                     solarSystemID, constellationID, regionID, orbitalID, radius_km))
-                        if len(rows) >= PLANET_BATCH_SIZE:
-                            self.con.executemany(
-                                "INSERT OR REPLACE INTO planets(itemID, typeID, groupID, category, typeName, itemName, solarSystemID, constellationID, regionID, orbitalID, radius_km) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
-                                rows,
-                            )
-                            inserted += len(rows)
-                            rows.clear()
-                    if rows:
-                        self.con.executemany(
-                            "INSERT OR REPLACE INTO planets(itemID, typeID, groupID, category, typeName, itemName, solarSystemID, constellationID, regionID, orbitalID, radius_km) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
-                            rows,
-                        )
-                        inserted += len(rows)
-                cur.execute("CREATE INDEX IF NOT EXISTS idx_planets_region ON planets(regionID)")
-                cur.execute("CREATE INDEX IF NOT EXISTS idx_planets_constellation ON planets(constellationID)")
-                cur.execute("CREATE INDEX IF NOT EXISTS idx_planets_system ON planets(solarSystemID)")
+                for name in PLANET_INDEXES:
+                    cur.execute(f"DROP INDEX IF EXISTS {name}")
+                planet_rows = _planet_rows_arrow if pa is not None else _planet_rows_mmap
+                inserted = cur.executemany(
+                    "INSERT INTO planets(itemID, typeID, groupID, category, typeName, itemName, solarSystemID, constellationID, regionID, orbitalID, radius_km) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                    planet_rows(path, type_map, cat_map),
+                ).rowcount
+                for name, cols in PLANET_INDEXES.items():
+                    cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON planets({cols})")
                 self.con.commit()
             except Exception:
                 self.con.rollback()
                 raise
-            finally:
-                self.con.commit()
-                cur.execute(f"PRAGMA synchronous={orig_sync}")
-                cur.execute(f"PRAGMA temp_store={orig_temp}")
-                cur.execute(f"PRAGMA cache_size={orig_cache}")
             return inserted
 
     def list_regions(self):
-        with self.lock:
-            q = """
-                SELECT regionID, regionName
-                FROM mapRegions
-                WHERE regionName IS NOT NULL
-                AND TRIM(regionName) <> ''
-                AND LOWER(regionName) <> 'no name'
-                ORDER BY regionName COLLATE NOCASE
-            """
-            return list(self.con.execute(q))
+        q = """
+            SELECT regionID, regionName
+            FROM mapRegions
+            WHERE regionName IS NOT NULL
+            AND TRIM(regionName) <> ''
+            AND LOWER(regionName) <> 'no name'
+            ORDER BY regionName COLLATE NOCASE
+        """
+        return list(self.con.execute(q))
+
+    @contextmanager
+    def bulk_read(self):
+        con = self.con
+        con.execute("BEGIN")
+        try:
+            yield self
+        finally:
+            con.commit()
 
     def constellations_in_region(self, region_id):
-        with self.lock:
-            q = """
-                SELECT constellationID, constellationName
-                FROM mapConstellations
-                WHERE regionID = ?
-                AND constellationName IS NOT NULL
-                AND TRIM(constellationName) <> ''
-                AND LOWER(constellationName) <> 'no name'
-                ORDER BY constellationName COLLATE NOCASE
-            """
-            return list(self.con.execute(q, (region_id,)))
+        q = """
+            SELECT constellationID, constellationName
+            FROM mapConstellations
+            WHERE regionID = ?
+            AND constellationName IS NOT NULL
+            AND TRIM(constellationName) <> ''
+            AND LOWER(constellationName) <> 'no name'
+            ORDER BY constellationName COLLATE NOCASE
+        """
+        return list(self.con.execute(q, (region_id,)))
 
     def systems_in_constellation(self, constellation_id):
-        with self.lock:
-            q = """
-                SELECT solarSystemID, solarSystemName
-                FROM mapSolarSystems
-                WHERE constellationID = ?
-                AND solarSystemName IS NOT NULL
-                AND TRIM(solarSystemName) <> ''
-                AND LOWER(solarSystemName) <> 'no name'
-                ORDER BY solarSystemName COLLATE NOCASE
-            """
-            return list(self.con.execute(q, (constellation_id,)))
+        q = """
+            SELECT solarSystemID, solarSystemName
+            FROM mapSolarSystems
+            WHERE constellationID = ?
+            AND solarSystemName IS NOT NULL
+            AND TRIM(solarSystemName) <> ''
+            AND LOWER(solarSystemName) <> 'no name'
+            ORDER BY solarSystemName COLLATE NOCASE
+        """
+        return list(self.con.execute(q, (constellation_id,)))
+
+    def clear_caches(self):
+        self._region_names.clear()
+        self._constellation_names.clear()
+        self._system_names.clear()
 
     def region_name(self, region_id):
-        with self.lock:
+        name = self._region_names.get(region_id)
+        if name is None:
             row = self.con.execute("SELECT regionName FROM mapRegions WHERE regionID = ?", (region_id,)).fetchone()
-            return row[0] if row else str(region_id)
+            name = self._region_names[region_id] = row[0] if row else str(region_id)
+        return name
 
     def constellation_name(self, constellation_id):
-        with self.lock:
+        name = self._constellation_names.get(constellation_id)
+        if name is None:
             row = self.con.execute("SELECT constellationName FROM mapConstellations WHERE constellationID = ?", (constellation_id,)).fetchone()
-            return row[0] if row else str(constellation_id)
+            name = self._constellation_names[constellation_id] = row[0] if row else str(constellation_id)
+        return name
 
     def system_name(self, system_id):
-        with self.lock:
+        name = self._system_names.get(system_id)
+        if name is None:
             row = self.con.execute("SELECT solarSystemName FROM mapSolarSystems WHERE solarSystemID = ?", (system_id,)).fetchone()
-            return row[0] if row else str(system_id)
+            name = self._system_names[system_id] = row[0] if row else str(system_id)
+        return name
+
+    def _count_planets(self, col, id_):
+        if col not in PLANET_INDEX_COLUMNS:
+            raise ValueError(f"Unsupported column: {col}")
+        row = self.con.execute(f"SELECT COUNT(1) FROM planets WHERE {col} = ?", (id_,)).fetchone()
+        return row[0] if row else 0
 
     def count_planets_region(self, region_id):
-        with self.lock:
-            row = self.con.execute("SELECT COUNT(1) FROM planets WHERE regionID = ?", (region_id,)).fetchone()
-            return row[0] if row else 0
+        return self._count_planets("regionID", region_id)
 
     def count_planets_constellation(self, constellation_id):
-        with self.lock:
-            row = self.con.execute("SELECT COUNT(1) FROM planets WHERE constellationID = ?", (constellation_id,)).fetchone()
-            return row[0] if row else 0
+        return self._count_planets("constellationID", constellation_id)
+
+    def _counts_by_category(self, col, id_):
+        if col not in PLANET_INDEX_COLUMNS:
+            raise ValueError(f"Unsupported column: {col}")
+        q = f"SELECT category, COUNT(1) FROM planets WHERE {col} = ? GROUP BY category"
+        counts = dict.fromkeys(_PT, 0)
+        for cat, c in self.con.execute(q, (id_,)):
+            if cat in counts:
+                counts[cat] = c
+            else:
+                counts["Barren"] += c
+        return counts
+
+    def _counts_by_category_grouped(self, group_col, col, id_):
+        if group_col not in PLANET_INDEX_COLUMNS or col not in PLANET_INDEX_COLUMNS:
+            raise ValueError(f"Unsupported column: {group_col}, {col}")
+        q = f"SELECT {group_col}, category, COUNT(1) FROM planets WHERE {col} = ? GROUP BY {group_col}, category"
+        return self._collect_grouped_counts(q, (id_,))
+
+    def _counts_by_category_ids(self, col, ids):
+        if col not in PLANET_INDEX_COLUMNS:
+            raise ValueError(f"Unsupported column: {col}")
+        ids = list(ids)
+        if not ids:
+            return {}
+        q = f"SELECT {col}, category, COUNT(1) FROM planets WHERE {col} IN ({','.join('?' * len(ids))}) GROUP BY {col}, category"
+        return self._collect_grouped_counts(q, ids)
+
+    def _collect_grouped_counts(self, q, params):
+        grouped = {}
+        for gid, cat, c in self.con.execute(q, params):
+            counts = grouped.get(gid)
+            if counts is None:
+                counts = grouped[gid] = dict.fromkeys(_PT, 0)
+            counts[cat if cat in counts else "Barren"] += c
+        return grouped
 
     def counts_by_category_system(self, system_id):
-        with self.lock:
-            q = "SELECT category, COUNT(1) FROM planets WHERE solarSystemID = ? GROUP BY category"
-            counts = {k: 0 for k in PLANET_TYPES}
-            for cat, c in self.con.execute(q, (system_id,)):
-                if cat in counts:
-                    counts[cat] = c
-                else:
-                    counts["Barren"] += c
-            return counts
+        return self._counts_by_category("solarSystemID", system_id)
 
     def counts_by_category_region(self, region_id):
-        with self.lock:
-            q = "SELECT category, COUNT(1) FROM planets WHERE regionID = ? GROUP BY category"
-            counts = {k: 0 for k in PLANET_TYPES}
-            for cat, c in self.con.execute(q, (region_id,)):
-                if cat in counts:
-                    counts[cat] = c
-                else:
-                    counts["Barren"] += c
-            return counts
+        return self._counts_by_category("regionID", region_id)
 
     def counts_by_category_constellation(self, constellation_id):
-        with self.lock:
-            q = "SELECT category, COUNT(1) FROM planets WHERE constellationID = ? GROUP BY category"
-            counts = {k: 0 for k in PLANET_TYPES}
-            for cat, c in self.con.execute(q, (constellation_id,)):
-                if cat in counts:
-                    counts[cat] = c
-                else:
-                    counts["Barren"] += c
-            return counts
+        return self._counts_by_category("constellationID", constellation_id)
 
-    def planets_in_system(self, system_id):
-        with self.lock:
-            q = ("SELECT itemID, itemName, radius_km, typeName, category FROM planets WHERE solarSystemID = ? ORDER BY orbitalID")
-            return list(self.con.execute(q, (system_id,)))
+    def counts_by_category_constellations_in_region(self, region_id):
+        return self._counts_by_category_grouped("constellationID", "regionID", region_id)
 
-    def total_regions(self):
-        with self.lock:
-            q = """
-                SELECT COUNT(*)
-                FROM mapRegions
-                WHERE regionName IS NOT NULL
-                AND TRIM(regionName) <> ''
-                AND LOWER(regionName) <> 'no name'
-            """
-            return self.con.execute(q).fetchone()[0]
-
-    def total_constellations(self):
-        with self.lock:
-            q = """
-                SELECT COUNT(*)
-                FROM mapConstellations
-                WHERE constellationName IS NOT NULL
-                AND TRIM(constellationName) <> ''
-                AND LOWER(constellationName) <> 'no name'
-            """
-            return self.con.execute(q).fetchone()[0]
+    def counts_by_category_systems_in_constellation(self, constellation_id):
+        return self._counts_by_category_grouped("solarSystemID", "constellationID", constellation_id)
 
-    def total_systems(self):
-        with self.lock:
-            q = """
-                SELECT COUNT(*)
-                FROM mapSolarSystems
-                WHERE solarSystemName IS NOT NULL
-                AND TRIM(solarSystemName) <> ''
-                AND LOWER(solarSystemName) <> 'no name'
-            """
-            return self.con.execute(q).fetchone()[0]
+    def counts_by_category_constellations(self, constellation_ids):
+        return self._counts_by_category_ids("constellationID", constellation_ids)
 
-    def total_planets(self):
-        with self.lock:
-            q = """
-                SELECT COUNT(*)
-                FROM planets p
-                JOIN mapRegions r ON r.regionID = p.regionID
-                WHERE r.regionName IS NOT NULL
-                AND TRIM(r.regionName) <> ''
-                AND LOWER(r.regionName) <> 'no name'
-            """
-            return self.con.execute(q).fetchone()[0]
+    def planets_in_system(self, system_id):
+        q = ("SELECT itemID, itemName, radius_km, typeName, category FROM planets WHERE solarSystemID = ? ORDER BY orbitalID, itemID")
+        return list(self.con.execute(q, (system_id,)))
+
+    def totals(self):
+        q = """
+            SELECT
+                (SELECT COUNT(*)
+                 FROM mapRegions
+                 WHERE regionName IS NOT NULL
+                 AND TRIM(regionName) <> ''
+                 AND LOWER(regionName) <> 'no name'),
+                (SELECT COUNT(*)
+                 FROM mapConstellations
+                 WHERE constellationName IS NOT NULL
+                 AND TRIM(constellationName) <> ''
+                 AND LOWER(constellationName) <> 'no name'),
+                (SELECT COUNT(*)
+                 FROM mapSolarSystems
+                 WHERE solarSystemName IS NOT NULL
+                 AND TRIM(solarSystemName) <> ''
+                 AND LOWER(solarSystemName) <> 'no name'),
+                (SELECT COUNT(*)
+                 FROM planets p
+                 JOIN mapRegions r ON r.regionID = p.regionID
+                 WHERE r.regionName IS NOT NULL
+                 AND TRIM(r.regionName) <> ''
+                 AND LOWER(r.regionName) <> 'no name')
+        """
+        return self.con.execute(q).fetchone()
 
 def download_file(url, dest):
     resp = requests.get(url, stream=True, timeout=60)
     resp.raise_for_status()
     with dest.open("wb") as f:
-        for chunk in resp.iter_content(chunk_size=8192):
+        for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
             if chunk:
                 f.write(chunk)
 
+def download_bz2_file(url, dest):
+    resp = requests.get(url, stream=True, timeout=60)
+    resp.raise_for_status()
+    decomp = bz2.BZ2Decompressor()
+    in_stream = False
+    with dest.open("wb") as f:
+        for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            while chunk:
+                in_stream = True
+                f.write(decomp.decompress(chunk))
+                if not decomp.eof:
+                    break
+                in_stream = False
+                chunk = decomp.unused_data
+                decomp = bz2.BZ2Decompressor()
+    if in_stream:
+        raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+
 def maybe_download_csv(local_dir, filename):
     csv_path = local_dir / filename
-    bz2_path = local_dir / (filename + ".bz2")
     try:
-        download_file(BASE_URL + filename + ".bz2", bz2_path)
-        with bz2.open(bz2_path, "rb") as src, csv_path.open("wb") as dst:
-            shutil.copyfileobj(src, dst, length=1024 * 1024)
+        download_bz2_file(BASE_URL + filename + ".bz2", csv_path)
         return csv_path
     except requests.HTTPError:
         download_file(BASE_URL + filename, csv_path)
@@ -568,15 +706,19 @@ class App:
         style.configure("Treeview.Heading", padding=(6, 28), anchor="center", font=self._heading_font)
         self.tree.configure(style="Treeview")
         self._col_to_type = {f"Planet ({pt})": pt for pt in PLANET_TYPES}
+        self._heading_cache = {}
+        self._heading_current = {}
         self.tree.heading("#0", text="Name")
         for col in columns:
-            text = self._heading_text_for_column(col, 90)
+            text = self._heading_current[col] = self._heading_text_for_column(col, 90)
             self.tree.heading(col, text=text, anchor="center")
         self._col_bases = {"#0": 225, **{col: 90 for col in columns}}
         self.tree.column("#0", width=self._col_bases["#0"], anchor="w", stretch=True)
         for col in columns:
             self.tree.column(col, width=self._col_bases[col], anchor="e", stretch=True)
+        self._col_widths = dict(self._col_bases)
         self._resizing = False
+        self._resize_pending = False
         self.root.after_idle(self._on_tree_configure)
         self.tree.bind("<Configure>", self._on_tree_configure)
         self.tree.tag_configure("evenrow", background="#ffffff")
@@ -587,6 +729,7 @@ class App:
         vsb.grid(row=0, column=1, sticky="ns")
         hsb.grid(row=1, column=0, sticky="ew")
         self.tree.bind("<<TreeviewOpen>>", self._on_open)
+        self.tree.bind("<<TreeviewClose>>", self._on_close)
         self.tree.bind("<Button-1>", self._on_click)
         bottom = ttk.Frame(root)
         bottom.grid(row=1, column=1, sticky="ew", padx=(4, 8), pady=(0, 8))
@@ -616,20 +759,35 @@ class App:
         self.clear_btn.grid(row=0, column=4, sticky="e", padx=(6, 0))
         self._all_regions = []
         self._filtered_regions = []
+        self._render_q = queue.Queue()
+        self._render_gen = 0
+        self._count_rows = {}
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending_loads = set()
+        self._unloaded = set()
+        self._kind = {}
+        self._id_of = {}
+        self._open = {}
+        self._parent = {}
+        self._open_desc = {}
+        self._consts_stale = False
         self.refresh_regions()
         self.refresh_counts()
         self.search_entry.focus_set()
 
     def refresh_regions(self):
-        self._all_regions = self.db.list_regions()
+        self._all_regions = [(rid, name, (name or "").lower()) for rid, name in self.db.list_regions()]
         self._apply_region_filter()
 
     def _apply_region_filter(self):
         q = (self.search_var.get() or "").lower()
-        self._filtered_regions = [r for r in self._all_regions if q in (r[1] or "").lower()]
+        filtered = [(rid, name) for rid, name, lname in self._all_regions if q in lname]
+        if filtered == self._filtered_regions:
+            return
+        self._filtered_regions = filtered
         self.region_list.delete(0, tk.END)
-        for _rid, name in self._filtered_regions:
-            self.region_list.insert(tk.END, name)
+        if filtered:
+            self.region_list.insert(tk.END, *[name for _rid, name in filtered])
 
     def _on_search(self, event=None):
         self._apply_region_filter()
@@ -667,15 +825,19 @@ class App:
             self.search_entry.focus_set()
         def enable_and_refresh():
             enable_controls()
+            self.db.clear_caches()
+            self._count_rows.clear()
             self.refresh_regions()
             self.refresh_counts()
+        def download(fname):
+            status_safe(self, f"Downloading {fname}…")
+            return maybe_download_csv(DATA_DIR, fname)
         def work():
             try:
                 status_safe(self, "Downloading data…")
-                local_paths = {}
-                for fname in DATA_FILES:
-                    status_safe(self, f"Downloading {fname}…")
-                    local_paths[fname] = maybe_download_csv(DATA_DIR, fname)
+                with ThreadPoolExecutor(max_workers=len(DATA_FILES)) as ex:
+                    futures = {fname: ex.submit(download, fname) for fname in DATA_FILES}
+                    local_paths = {fname: fut.result() for fname, fut in futures.items()}
                 status_safe(self, "Importing into SQLite…")
                 self.db.clear_all()
                 self.db.import_csv_invTypes(local_paths["invTypes.csv"])
@@ -695,91 +857,137 @@ class App:
     def _iid(self, kind, id_):
         return f"{kind}:{id_}"
 
-    def _parse_iid(self, iid, expected_prefix):
-        if iid and iid.startswith(expected_prefix + ":"):
-            try:
-                return int(iid.split(":", 1)[1])
-            except Exception:
-                return 0
-        return 0
-
-    def _zebra_tag(self, parent):
-        idx = len(self.tree.get_children(parent))
-        return "evenrow" if idx % 2 == 0 else "oddrow"
+    def _zebra_tag(self, idx):
+        return "oddrow" if idx & 1 else "evenrow"
+
+    def _count_row(self, db, kind, id_, by_type):
+        key = (kind, id_, by_type)
+        row = self._count_rows.get(key)
+        if row is None:
+            col = KIND_COLUMNS[kind]
+            if by_type:
+                vals = _pt_counts(db._counts_by_category(col, id_))
+                row = (sum(vals), *vals, "")
+            else:
+                row = (db._count_planets(col, id_), *_BLANK_TAIL)
+            self._count_rows[key] = row
+        return row
+
+    def _store_count_rows(self, kind, ids, grouped):
+        zero = (0,) * len(_PT)
+        for id_ in ids:
+            counts = grouped.get(id_)
+            vals = _pt_counts(counts) if counts else zero
+            total = sum(vals)
+            self._count_rows[(kind, id_, True)] = (total, *vals, "")
+            self._count_rows[(kind, id_, False)] = (total, *_BLANK_TAIL)
+
+    def _reset_tree_state(self):
+        self._render_gen += 1
+        self._unloaded.clear()
+        self._kind.clear()
+        self._id_of.clear()
+        self._parent.clear()
+        self._open.clear()
+        self._open_desc.clear()
+        self._consts_stale = False
+
+    def _delete_all_children(self, parent):
+        children = self.tree.get_children(parent)
+        for i in range(0, len(children), DELETE_BATCH_SIZE):
+            self.tree.delete(*children[i:i + DELETE_BATCH_SIZE])
 
     def populate_region(self, region_id, show_constellations=True):
-        try:
-            self.tree.delete(*self.tree.get_children(""))
-        except Exception:
-            for iid in self.tree.get_children(""):
-                self.tree.delete(iid)
+        self._delete_all_children("")
         self.current_region_id = region_id
-        rname = self.db.region_name(region_id)
-        if getattr(self, "show_region_types", None) and self.show_region_types.get():
-            counts = self.db.counts_by_category_region(region_id)
-            row = [sum(counts.values())] + [counts.get(t, 0) for t in PLANET_TYPES] + [""]
+        self._reset_tree_state()
+        self._executor.submit(self._fetch_region, self._render_gen, region_id, show_constellations)
+
+    def _fetch_region(self, gen, region_id, show_constellations):
+        if gen != self._render_gen:
+            return
+        try:
+            with self.db.bulk_read() as db:
+                rname = db.region_name(region_id)
+                if ("region", region_id, True) not in self._count_rows:
+                    self._store_count_rows("region", [region_id], {region_id: db.counts_by_category_region(region_id)})
+                consts = []
+                if show_constellations:
+                    consts = db.constellations_in_region(region_id)
+                    if any(("constellation", cid, True) not in self._count_rows for cid, _ in consts):
+                        self._store_count_rows("constellation", [cid for cid, _ in consts],
+                                               db.counts_by_category_constellations_in_region(region_id))
+        except Exception as e:
+            status_safe(self, f"Error: {e}")
+            return
+        region_iid = self._iid("region", region_id)
+        self._render_q.put((gen, "", region_iid, region_id, f"Region: {rname}", ("region",), True, False))
+        for idx, (const_id, const_name) in enumerate(consts):
+            self._render_q.put((gen, region_iid, self._iid("const", const_id), const_id, f"Constellation: {const_name}",
+                                ("constellation", self._zebra_tag(idx)), False, True))
+        self.root.after(0, self._render_tick)
+
+    def _render_tick(self):
+        for _ in range(RENDER_BATCH_SIZE):
+            try:
+                gen, parent, iid, id_, text, tags, is_open, lazy = self._render_q.get_nowait()
+            except queue.Empty:
+                break
+            if gen != self._render_gen or (parent and parent not in self._kind):
+                continue
+            kind = tags[0]
+            by_type = (self.show_region_types if kind == "region" else self.show_const_types).get()
+            values = self._count_row(self.db, kind, id_, by_type)
+            self.tree.insert(parent, "end", iid=iid, text=text, values=values, tags=tags, open=is_open)
+            self._kind[iid] = kind
+            self._id_of[iid] = id_
+            self._parent[iid] = parent
+            self._open[iid] = is_open
+            if lazy:
+                self.tree.insert(iid, "end", iid=f"{iid}:placeholder", text="…", values=(), tags=("placeholder",))
+                self._unloaded.add(iid)
         else:
-            total = self.db.count_planets_region(region_id)
-            row = [total] + [""] * (len(COL_HEADERS) - 2) + [""]
-        region_iid = self.tree.insert(
-            "", "end",
-            iid=self._iid("region", region_id),
-            text=f"Region: {rname}",
-            values=row,
-            tags=("region",),
-        )
-        self.tree.item(region_iid, open=True)
-        if show_constellations:
-            self._load_constellations(region_iid, region_id)
-
-    def _load_constellations(self, region_item, region_id):
-        consts = self.db.constellations_in_region(region_id)
-        for const_id, const_name in consts:
-            if getattr(self, "show_const_types", None) and self.show_const_types.get():
-                counts = self.db.counts_by_category_constellation(const_id)
-                values = [sum(counts.values())] + [counts.get(t, 0) for t in PLANET_TYPES] + [""]
-            else:
-                total = self.db.count_planets_constellation(const_id)
-                values = [total] + [""] * (len(COL_HEADERS) - 2) + [""]
-            iid = self.tree.insert(
-                region_item,
-                "end",
-                iid=self._iid("const", const_id),
-                text=f"Constellation: {const_name}",
-                values=values,
-                tags=("constellation", self._zebra_tag(region_item)),
-            )
-            self.tree.insert(iid, "end", text="…", values=[""] * len(COL_HEADERS), tags=("placeholder",))
+            self.root.after_idle(self._render_tick)
+
+    def _fetch_systems(self, const_id):
+        with self.db.bulk_read() as db:
+            systems = db.systems_in_constellation(const_id)
+            if any(("system", sid, True) not in self._count_rows for sid, _ in systems):
+                self._store_count_rows("system", [sid for sid, _ in systems],
+                                       db.counts_by_category_systems_in_constellation(const_id))
+            systems = [(sid, name, self._count_row(db, "system", sid, True)) for sid, name in systems]
+        iid_of = self._iid
+        return [(iid_of("system", sys_id), sys_id, f"System: {sys_name}", row) for sys_id, sys_name, row in systems]
+
+    def _insert_systems(self, const_item, rows):
+        insert = self.tree.insert
+        zebra = (("system", "evenrow"), ("system", "oddrow"))
+        for idx, (iid, _, label, row) in enumerate(rows):
+            insert(const_item, "end", iid=iid, text=label, values=row, tags=zebra[idx & 1])
+            insert(iid, "end", iid=f"{iid}:placeholder", text="…", values=(), tags=("placeholder",))
+        self._unloaded.update(iid for iid, _, _, _ in rows)
+        self._kind.update((iid, "system") for iid, _, _, _ in rows)
+        self._id_of.update((iid, sys_id) for iid, sys_id, _, _ in rows)
+        self._parent.update((iid, const_item) for iid, _, _, _ in rows)
 
     def _load_systems(self, const_item, const_id):
-        systems = self.db.systems_in_constellation(const_id)
-        for sys_id, sys_name in systems:
-            counts = self.db.counts_by_category_system(sys_id)
-            row = [sum(counts.values())] + [counts.get(t, 0) for t in PLANET_TYPES] + [""]
-            iid = self.tree.insert(
-                const_item,
-                "end",
-                iid=self._iid("system", sys_id),
-                text=f"System: {sys_name}",
-                values=row,
-                tags=("system", self._zebra_tag(const_item)),
-            )
-            self.tree.insert(iid, "end", text="…", values=[""] * len(COL_HEADERS), tags=("placeholder",))
+        self._insert_systems(const_item, self._fetch_systems(const_id))
+
+    def _fetch_planets(self, sys_id):
+        return [
+            (f"{itemName or '(Unnamed)'} — {category or typeName or 'Unknown'}",
+             (*_BLANK_LEAD, f"{radius_km:,.0f}" if radius_km is not None else ""))
+            for itemID, itemName, radius_km, typeName, category in self.db.planets_in_system(sys_id)
+        ]
+
+    def _insert_planets(self, sys_item, rows):
+        insert = self.tree.insert
+        zebra = (("planet", "evenrow"), ("planet", "oddrow"))
+        for idx, (label, row) in enumerate(rows):
+            insert(sys_item, "end", text=label, values=row, tags=zebra[idx & 1])
 
     def _load_planets(self, sys_item, sys_id):
-        planets = self.db.planets_in_system(sys_id)
-        for itemID, itemName, radius_km, typeName, category in planets:
-            kind = category or typeName or "Unknown"
-            label = f"{itemName or '(Unnamed)'} — {kind}"
-            radius_disp = f"{radius_km:,.0f}" if radius_km is not None else ""
-            row = [""] * (len(COL_HEADERS) - 1) + [radius_disp]
-            self.tree.insert(
-                sys_item,
-                "end",
-                text=label,
-                values=row,
-                tags=("planet", self._zebra_tag(sys_item)),
-            )
+        self._insert_planets(sys_item, self._fetch_planets(sys_id))
 
     def _wrap_type_heading(self, pt):
         s = pt.strip()
@@ -792,6 +1000,13 @@ class App:
         return f"Planet\n({s})"
 
     def _heading_text_for_column(self, col, width_px):
+        key = (col, width_px & ~3)
+        text = self._heading_cache.get(key)
+        if text is None:
+            text = self._heading_cache[key] = self._build_heading_text(col, key[1])
+        return text
+
+    def _build_heading_text(self, col, width_px):
         if col == "Total Planets":
             return "Total\nPlanets"
         if col == "Radius (km)":
@@ -821,17 +1036,23 @@ class App:
     def _hyphenate_to_fit(self, word, maxw):
         f = self._heading_font
         n = len(word)
-        for offset in range(0, n):
-            for cut in (n//2 - offset, n//2 + offset):
-                if 2 <= cut < n-1:
-                    left = word[:cut] + "-"
-                    right = word[cut:]
-                    if f.measure(left) <= maxw and f.measure(right) <= maxw:
-                        return left, right
+        cuts = range(2, n - 1)
+        lo = bisect_left(cuts, True, key=lambda c: f.measure(word[c:]) <= maxw)
+        hi = bisect_left(cuts, True, key=lambda c: f.measure(word[:c] + "-") > maxw) - 1
+        if lo <= hi:
+            cut = cuts[min(max(n//2 - 2, lo), hi)]
+            return word[:cut] + "-", word[cut:]
         cut = max(2, min(n-1, n//2))
         return word[:cut] + "-", word[cut:]
 
     def _on_tree_configure(self, event=None):
+        if self._resize_pending:
+            return
+        self._resize_pending = True
+        self.tree.after_idle(self._apply_tree_resize)
+
+    def _apply_tree_resize(self):
+        self._resize_pending = False
         if getattr(self, "_col_bases", None) is None:
             return
         if getattr(self, "_resizing", False):
@@ -845,20 +1066,20 @@ class App:
             scale = avail / total_base
             for cid, base in self._col_bases.items():
                 neww = max(60, int(base * scale))
-                self.tree.column(cid, width=neww, stretch=True)
+                if self._col_widths.get(cid) != neww:
+                    self.tree.column(cid, width=neww, stretch=True)
+                    self._col_widths[cid] = neww
             for col in COL_HEADERS:
-                cur_w = int(self.tree.column(col, option="width") or 90)
-                new_text = self._heading_text_for_column(col, cur_w)
-                self.tree.heading(col, text=new_text)
+                new_text = self._heading_text_for_column(col, self._col_widths[col])
+                if self._heading_current.get(col) != new_text:
+                    self.tree.heading(col, text=new_text)
+                    self._heading_current[col] = new_text
         finally:
             self._resizing = False
 
     def refresh_counts(self):
         try:
-            r = self.db.total_regions()
-            c = self.db.total_constellations()
-            s = self.db.total_systems()
-            p = self.db.total_planets()
+            r, c, s, p = self.db.totals()
         except Exception:
             r = c = s = p = 0
         self.counts_var.set(
@@ -872,20 +1093,64 @@ class App:
         item = self.tree.focus()
         if not item:
             return
-        tags = self.tree.item(item, "tags") or ()
-        children = self.tree.get_children(item)
-        if "constellation" in tags:
-            if children and "placeholder" in (self.tree.item(children[0], "tags") or ()): 
-                for c in children:
-                    self.tree.delete(c)
-                const_id = self._parse_iid(item, "const")
-                self._load_systems(item, const_id)
-        elif "system" in tags:
-            if children and "placeholder" in (self.tree.item(children[0], "tags") or ()): 
-                for c in children:
-                    self.tree.delete(c)
-                sys_id = self._parse_iid(item, "system")
-                self._load_planets(item, sys_id)
+        self._mark_open(item, True)
+        if item in self._pending_loads or item not in self._unloaded:
+            return
+        kind = self._kind.get(item)
+        if kind == "constellation":
+            future = self._executor.submit(self._fetch_systems, self._id_of.get(item, 0))
+            insert_rows = self._insert_systems
+        elif kind == "system":
+            future = self._executor.submit(self._fetch_planets, self._id_of.get(item, 0))
+            insert_rows = self._insert_planets
+        else:
+            return
+        self._pending_loads.add(item)
+        self.tree.item(f"{item}:placeholder", text="Loading…")
+        self.root.after(LOAD_POLL_MS, self._poll_load, future, item, self._render_gen, insert_rows)
+
+    def _on_close(self, event):
+        item = self.tree.focus()
+        if item:
+            self._mark_open(item, False)
+
+    def _set_open(self, item, is_open):
+        self.tree.item(item, open=is_open)
+        self._mark_open(item, is_open)
+
+    def _mark_open(self, item, is_open):
+        if self._open.get(item, False) != is_open:
+            self._open[item] = is_open
+            delta = 1 if is_open else -1
+            parent = self._parent.get(item)
+            while parent:
+                self._open_desc[parent] = self._open_desc.get(parent, 0) + delta
+                parent = self._parent.get(parent)
+        if is_open and self._consts_stale and self._kind.get(item) == "region":
+            self._refresh_constellation_rows()
+
+    def _poll_load(self, future, item, gen, insert_rows):
+        if not future.done():
+            self.root.after(LOAD_POLL_MS, self._poll_load, future, item, gen, insert_rows)
+            return
+        self._pending_loads.discard(item)
+        if gen != self._render_gen or item not in self._unloaded:
+            return
+        try:
+            rows = future.result()
+        except Exception as e:
+            self.tree.item(f"{item}:placeholder", text="…")
+            status_safe(self, f"Error: {e}")
+            return
+        self._claim_unloaded(item)
+        insert_rows(item, rows)
+
+    def _claim_unloaded(self, item):
+        if item not in self._unloaded:
+            return False
+        self._unloaded.discard(item)
+        self.tree.delete(f"{item}:placeholder")
+        return True
 
     def _on_click(self, event):
         if (event.state & 0x0001) == 0:
@@ -893,158 +1158,111 @@ class App:
         row_id = self.tree.identify_row(event.y)
         if not row_id:
             return
-        tags = self.tree.item(row_id, "tags") or ()
-        if "region" in tags:
-            any_open = False
-            for const_item in self.tree.get_children(row_id):
-                if "constellation" in (self.tree.item(const_item, "tags") or ()):
-                    if self.tree.item(const_item, "open"):
-                        any_open = True
-                        break
-                    for sys_item in self.tree.get_children(const_item):
-                        if ("system" in (self.tree.item(sys_item, "tags") or ())
-                                and self.tree.item(sys_item, "open")):
-                            any_open = True
-                            break
-                if any_open:
-                    break
-            if any_open:
+        kind = self._kind.get(row_id)
+        if kind == "region":
+            if self._open_desc.get(row_id, 0) > 0:
                 self._collapse_all_region(row_id)
             else:
                 self._expand_all_region(row_id)
-        elif "constellation" in tags:
-            any_open = any(
-                self.tree.item(s, "open")
-                for s in self.tree.get_children(row_id)
-                if "system" in (self.tree.item(s, "tags") or ())
-            )
-            if any_open:
+        elif kind == "constellation":
+            if self._open_desc.get(row_id, 0) > 0:
                 self._collapse_all_constellation(row_id)
             else:
                 self._expand_all_constellation(row_id)
-        elif "system" in tags:
-            const_item = self.tree.parent(row_id)
+        elif kind == "system":
+            const_item = self._parent.get(row_id)
             if not const_item:
                 return
-            sys_children = [
-                s for s in self.tree.get_children(const_item)
-                if "system" in (self.tree.item(s, "tags") or ())
-            ]
-            any_open = any(self.tree.item(s, "open") for s in sys_children)
-            if any_open:
+            if self._open_desc.get(const_item, 0) > 0:
                 self._collapse_systems_keep_constellation_open(const_item)
             else:
                 self._expand_all_systems_in_constellation(const_item)
 
     def _expand_item(self, item):
-        tags = self.tree.item(item, "tags") or ()
-        children = self.tree.get_children(item)
-        if "constellation" in tags:
-            if children and "placeholder" in (self.tree.item(children[0], "tags") or ()): 
-                for c in children:
-                    self.tree.delete(c)
-                const_id = self._parse_iid(item, "const")
-                self._load_systems(item, const_id)
-        elif "system" in tags:
-            if children and "placeholder" in (self.tree.item(children[0], "tags") or ()): 
-                for c in children:
-                    self.tree.delete(c)
-                sys_id = self._parse_iid(item, "system")
-                self._load_planets(item, sys_id)
+        if not self._claim_unloaded(item):
+            return
+        kind = self._kind.get(item)
+        if kind == "constellation":
+            self._load_systems(item, self._id_of.get(item, 0))
+        elif kind == "system":
+            self._load_planets(item, self._id_of.get(item, 0))
 
     def _expand_all_constellation(self, const_item):
-        self.tree.item(const_item, open=True)
-        children = self.tree.get_children(const_item)
-        if children and "placeholder" in (self.tree.item(children[0], "tags") or ()): 
-            for c in children:
-                self.tree.delete(c)
-            const_id = self._parse_iid(const_item, "const")
-            self._load_systems(const_item, const_id)
+        self._set_open(const_item, True)
+        if self._claim_unloaded(const_item):
+            self._load_systems(const_item, self._id_of.get(const_item, 0))
         for sys_item in self.tree.get_children(const_item):
-            if "system" in (self.tree.item(sys_item, "tags") or ()): 
+            if self._kind.get(sys_item) == "system": 
                 self._expand_item(sys_item)
-                self.tree.item(sys_item, open=True)
+                self._set_open(sys_item, True)
 
     def _collapse_all_constellation(self, const_item):
         for sys_item in self.tree.get_children(const_item):
-            if "system" in (self.tree.item(sys_item, "tags") or ()): 
-                self.tree.item(sys_item, open=False)
-        self.tree.item(const_item, open=True)
+            if self._kind.get(sys_item) == "system": 
+                self._set_open(sys_item, False)
+        self._set_open(const_item, True)
 
     def _expand_all_region(self, region_item):
-        self.tree.item(region_item, open=True)
+        self._set_open(region_item, True)
         for const_item in self.tree.get_children(region_item):
-            if "constellation" in (self.tree.item(const_item, "tags") or ()): 
-                self.tree.item(const_item, open=True)
-                children = self.tree.get_children(const_item)
-                if children and "placeholder" in (self.tree.item(children[0], "tags") or ()): 
-                    for c in children:
-                        self.tree.delete(c)
-                    const_id = self._parse_iid(const_item, "const")
-                    self._load_systems(const_item, const_id)
+            if self._kind.get(const_item) == "constellation": 
+                self._set_open(const_item, True)
+                if self._claim_unloaded(const_item):
+                    self._load_systems(const_item, self._id_of.get(const_item, 0))
 
     def _collapse_all_region(self, region_item):
         for const_item in self.tree.get_children(region_item):
-            if "constellation" in (self.tree.item(const_item, "tags") or ()): 
+            if self._kind.get(const_item) == "constellation": 
                 for sys_item in self.tree.get_children(const_item):
-                    if "system" in (self.tree.item(sys_item, "tags") or ()): 
-                        self.tree.item(sys_item, open=False)
-                self.tree.item(const_item, open=False)
-        self.tree.item(region_item, open=True)
+                    if self._kind.get(sys_item) == "system": 
+                        self._set_open(sys_item, False)
+                self._set_open(const_item, False)
+        self._set_open(region_item, True)
 
     def _expand_all_systems_in_constellation(self, const_item):
-        self.tree.item(const_item, open=True)
+        self._set_open(const_item, True)
         for sys_item in self.tree.get_children(const_item):
-            if "system" in (self.tree.item(sys_item, "tags") or ()): 
+            if self._kind.get(sys_item) == "system": 
                 self._expand_item(sys_item)
-                self.tree.item(sys_item, open=True)
+                self._set_open(sys_item, True)
 
     def _collapse_systems_keep_constellation_open(self, const_item):
         for sys_item in self.tree.get_children(const_item):
-            if "system" in (self.tree.item(sys_item, "tags") or ()): 
-                self.tree.item(sys_item, open=False)
-        self.tree.item(const_item, open=True)
+            if self._kind.get(sys_item) == "system": 
+                self._set_open(sys_item, False)
+        self._set_open(const_item, True)
 
     def _on_toggle_breakdowns(self):
-        roots = self.tree.get_children("")
-        if not roots:
-            return
-        region_item = roots[0]
-        rid = self._parse_iid(region_item, "region")
+        region_item = next((iid for iid, kind in self._kind.items() if kind == "region"), None)
+        rid = self._id_of.get(region_item)
         if not rid:
             return
-        if self.show_region_types.get():
-            rcounts = self.db.counts_by_category_region(rid)
-            rrow = [sum(rcounts.values())] + [rcounts.get(t, 0) for t in PLANET_TYPES] + [""]
+        with self.db.bulk_read() as db:
+            self.tree.item(region_item, values=self._count_row(db, "region", rid, self.show_region_types.get()))
+        if self._open.get(region_item):
+            self._refresh_constellation_rows()
         else:
-            rtotal = self.db.count_planets_region(rid)
-            rrow = [rtotal] + [""] * (len(COL_HEADERS) - 2) + [""]
-        for i, col in enumerate(COL_HEADERS):
-            self.tree.set(region_item, col, rrow[i])
-        for const_item in self.tree.get_children(region_item):
-            tags = self.tree.item(const_item, "tags") or ()
-            if "constellation" not in tags:
-                continue
-            cid = self._parse_iid(const_item, "const")
-            if not cid:
-                continue
-            if self.show_const_types.get():
-                ccounts = self.db.counts_by_category_constellation(cid)
-                crow = [sum(ccounts.values())] + [ccounts.get(t, 0) for t in PLANET_TYPES] + [""]
-            else:
-                ctotal = self.db.count_planets_constellation(cid)
-                crow = [ctotal] + [""] * (len(COL_HEADERS) - 2) + [""]
-            for i, col in enumerate(COL_HEADERS):
-                self.tree.set(const_item, col, crow[i])
+            self._consts_stale = True
+
+    def _refresh_constellation_rows(self):
+        self._consts_stale = False
+        const_items = [
+            (iid, self._id_of.get(iid, 0)) for iid, kind in self._kind.items() if kind == "constellation"
+        ]
+        show_const_types = self.show_const_types.get()
+        missing = [cid for _, cid in const_items if cid and ("constellation", cid, show_const_types) not in self._count_rows]
+        with self.db.bulk_read() as db:
+            if missing:
+                self._store_count_rows("constellation", missing, db.counts_by_category_constellations(missing))
+            crows = [(const_item, self._count_row(db, "constellation", cid, show_const_types)) for const_item, cid in const_items if cid]
+        for const_item, crow in crows:
+            self.tree.item(const_item, values=crow)
 
     def clear_view(self):
-        try:
-            self.tree.delete(*self.tree.get_children(""))
-        except Exception:
-            for iid in self.tree.get_children(""):
-                self.tree.delete(iid)
+        self._delete_all_children("")
         self.status_var.set("Cleared.")
         self.current_region_id = None
+        self._reset_tree_state()
         self.region_list.selection_clear(0, tk.END)
 
 